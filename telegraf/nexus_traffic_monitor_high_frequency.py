@@ -12,24 +12,138 @@ import argparse
 import logging
 from logging.handlers import RotatingFileHandler
 import json
+import csv
 import time
 import re
-from datetime import datetime,timedelta
+import string
+from datetime import datetime,timedelta,timezone
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 import subprocess
+import hashlib
 import requests
 import urllib3
+try:
+    # Optional. Decodes NX-API responses and JSON output of show commands
+    # faster than json
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 HOURS_IN_DAY = 24
 MINUTES_IN_HOUR = 60
 SECONDS_IN_MINUTE = 60
+UPTIME_UNIT_SECS = {
+    'day': HOURS_IN_DAY * MINUTES_IN_HOUR * SECONDS_IN_MINUTE,
+    'hour': MINUTES_IN_HOUR * SECONDS_IN_MINUTE,
+    'min': SECONDS_IN_MINUTE,
+    'sec': 1,
+}
+# TODO: Update this as per timezone
+QUEUE_MODTS_OFFSET = timedelta(hours=7)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+PEAK_TIME_FORMAT = '%Y/%m/%d %H:%M:%S:%f'
+
+# Numbers in dirty strings like transceiver stats. Compiled once
+FLOAT_RE = re.compile(r"[-+]?\d*\.\d+|\d+")
+
+# dn of mgmt, loopback, svi and sub-interfaces. Matched in a single scan
+SKIP_DN_RE = re.compile(r'mgmt|lo|svi|\.')
+
+# Patterns of the LLDP, uptime and PFC watchdog parsers
+LINUX_RE = re.compile('Linux', re.IGNORECASE)
+PORT_DESC_RE = re.compile(r'fab\w+|en\w+')
+UPTIME_RE = re.compile(r'(\d+)[ ]{1,}(day|hour|min|sec)')
+PFCWD_INTF_RE = re.compile(r'(Eth.*?)[ ]', re.IGNORECASE)
+PFCWD_QOSGRP_RE = re.compile(r'([0-9]) ')
+
+# Burst duration like 206.46 us, 1.47 ms or 2 s and the factor to us
+DURATION_RE = re.compile(r'\s*([\d.]+)\s*(us|ms|s)\s*')
+DURATION_US_FACTOR = {'ms': 1000, 's': 1000000}
+
+# Unit suffix stripped by the fast path of get_float_from_string
+UNIT_CHARS = string.ascii_letters + ' '
+
+# (output key, attribute) pairs copied by the interface stats parsers
+RMON_ETHER_STATS_KEYS = (
+    ('rx_crc', 'cRCAlignErrors'),
+    ('rx_crc_stomped', 'stompedCRCAlignErrors'),
+    ('tx_jumbo', 'txOversizePkts'),
+    ('rx_jumbo', 'rxOversizePkts'),
+    ('rxPkts1024to1518Octets', 'rxPkts1024to1518Octets'),
+    ('rxPkts512to1023Octets', 'rxPkts512to1023Octets'),
+    ('rxPkts256to511Octets', 'rxPkts256to511Octets'),
+    ('rxPkts128to255Octets', 'rxPkts128to255Octets'),
+    ('rxPkts65to127Octets', 'rxPkts65to127Octets'),
+    ('rxPkts64Octets', 'rxPkts64Octets'),
+    ('txPkts1024to1518Octets', 'txPkts1024to1518Octets'),
+    ('txPkts512to1023Octets', 'txPkts512to1023Octets'),
+    ('txPkts256to511Octets', 'txPkts256to511Octets'),
+    ('txPkts128to255Octets', 'txPkts128to255Octets'),
+    ('txPkts65to127Octets', 'txPkts65to127Octets'),
+    ('txPkts64Octets', 'txPkts64Octets'),
+)
+RMON_IF_HC_IN_KEYS = (
+    ('rx_broadcast_pkts', 'broadcastPkts'),
+    ('rx_multicast_pkts', 'multicastPkts'),
+    ('rx_ucast_pkts', 'ucastPkts'),
+    ('rx_bytes', 'octets'),
+)
+RMON_IF_HC_OUT_KEYS = (
+    ('tx_broadcast_pkts', 'broadcastPkts'),
+    ('tx_multicast_pkts', 'multicastPkts'),
+    ('tx_ucast_pkts', 'ucastPkts'),
+    ('tx_bytes', 'octets'),
+)
+IPQOS_QUEUING_STATS_KEYS = (
+    ('tx_bytes', 'txBytes'),
+    ('tx_pkts', 'txPackets'),
+    ('drop_bytes', 'dropBytes'),
+    ('drop_pkts', 'dropPackets'),
+    ('rx_pause', 'pfcRxPpp'),
+    ('tx_pause', 'pfcTxPpp'),
+    ('rand_drop_bytes', 'randDropBytes'),
+    ('rand_drop_pkts', 'randDropPackets'),
+    ('ecn_marked_pkts', 'randEcnMarkedPackets'),
+    ('q_depth', 'ucCurrQueueDepth'),
+    ('modTs', 'modTs'),
+)
+# (output key, row key) pairs of show hardware internal buffer info pkt-stats
+BUFFER_PKT_STATS_KEYS = (
+    ('peak_cell_drop_pg', 'max_cell_usage_drop_pg'),
+    ('peak_cell_no_drop', 'max_cell_usage_no_drop_pg'),
+    ('cell_count_drop_pg', 'switch_cell_count_drop_pg'),
+    ('cell_count_no_drop_pg', 'switch_cell_count_no_drop_pg'),
+)
 
 user_args = {}
 FILENAME_PREFIX = __file__.replace('.py', '')
 INPUT_FILE_PREFIX = ''
+# Set by setup_logging. Token cache files are kept next to the log file
+TOKEN_FILE_PREFIX = ''
+# A cached token that expires within these many seconds is not reused
+TOKEN_EXPIRY_MARGIN = 30
 
 LOGFILE_LOCATION = '/var/log/telegraf/'
 LOGFILE_SIZE = 10000000
 LOGFILE_NUMBER = 10
+# Seconds to wait for a command run by run_cmd, like ssh to a switch. A hung
+# command must not block the poll that telegraf runs at a fixed interval
+RUN_CMD_TIMEOUT = 30
+# DME MO requests to a switch that are in flight at the same time
+DME_MAX_WORKERS = 6
+# OpenSSH connection sharing. The first ssh to a switch becomes the master
+# and the next commands, also of the next polls, reuse its connection
+# without a new TCP handshake, key exchange and authentication
+SSH_MUX_OPTIONS = ['-o', 'ControlMaster=auto',
+                   '-o', 'ControlPersist=60s']
+# Set by setup_logging. Control sockets are kept next to the log file.
+# Empty if that path is too long for a socket, then ssh is not shared
+SSH_CONTROL_PREFIX = ''
+# A socket path must be shorter than 108 bytes. ssh adds 17 characters
+# while creating it and the name of a switch adds 16
+SSH_CONTROL_PREFIX_MAX = 108 - 17 - 16 - 1
 logger = logging.getLogger('NTM')
 
 # Dictionary with key as IP and value as list of user and passwd
@@ -43,6 +157,10 @@ stats_dict = {}
 # to update stats_dict
 raw_cli_stats = {}
 
+# Dictionary with key as endpoint or command in n9k_mo_dict and value as its
+# MO name, like sysmgrShowVersion. Filled by get_switch_stats
+mo_name_dict = {}
+
 proxies = {
     "http": "",
     "https": "",
@@ -79,18 +197,35 @@ response_time_dict = {}
 # BEGIN: Generic functions
 ###############################################################################
 
-def run_cmd(cmd_list):
+class LazyJson:
+    """
+    Log argument that is serialized with json.dumps only when the log record
+    is emitted. logging calls str() on arguments after the level check
+    """
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return json.dumps(self.obj, indent=2)
+
+class DmeAuthError(Exception):
+    """
+    Raised by dme_connect when the switch rejects the auth cookie. Tells an
+    expired token apart from other failures of a DME request
+    """
+
+def run_cmd(cmd_list, timeout=RUN_CMD_TIMEOUT):
     """Generic function to run any command"""
     ret = None
     # TODO: This ret needs proper handling
     try:
-        output = subprocess.run(cmd_list, stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE)
+        output = subprocess.run(cmd_list, capture_output=True,
+                                encoding='utf-8', errors='replace',
+                                check=False, timeout=timeout)
         if output.returncode != 0:
-            logger.error('%s failed:%s', cmd_list, \
-                         str(output.stderr.decode('utf-8').strip()))
+            logger.error('%s failed:%s', cmd_list, output.stderr.strip())
         else:
-            ret = str(output.stdout.decode('utf-8').strip())
+            ret = output.stdout.strip()
     except Exception as e:
         logger.exception('Exception: %s', e)
     return ret
@@ -151,6 +286,15 @@ def parse_cmdline_arguments():
             values can be captured the next time')
     parser.add_argument("--utcoh", type=str, help="UTC offset hours of the switch timezone. Example, +5, -7, etc. Not needed NX-OS 10.5(1) onwards")
     parser.add_argument("--utcom", type=str, help="UTC offset minutes of the switch timezone. Example, 30. Not needed NX-OS 10.5(1) onwards")
+    parser.add_argument("--max-workers", dest='max_workers', type=int, \
+            default=32, help="Maximum number of switches polled in parallel. \
+            Default 32")
+    parser.add_argument("--token-ttl", dest='token_ttl', type=int, \
+            default=0, help="Reuse the login token of a switch for these many \
+            seconds across runs instead of login and logout every time. Keep \
+            it below the token timeout of the switch and above the polling \
+            interval plus %d seconds. Default 0 (disabled)" % \
+            TOKEN_EXPIRY_MARGIN)
     parser.add_argument('-V', dest='verify_only', \
             action='store_true', default=False, help='verify \
             connection and stats pull but do not print the stats')
@@ -164,6 +308,12 @@ def parse_cmdline_arguments():
             action='store_true', default=False, help='Dump raw data')
 
     args = parser.parse_args()
+    # A token is not reused in its last TOKEN_EXPIRY_MARGIN seconds. A
+    # shorter ttl would skip logout and leave a session on the switch
+    # every run without ever reusing it
+    if 0 < args.token_ttl <= TOKEN_EXPIRY_MARGIN:
+        parser.error('--token-ttl must be 0 or more than %d seconds' % \
+                     TOKEN_EXPIRY_MARGIN)
     user_args['input_file'] = args.input_file
     user_args['output_format'] = args.output_format
     user_args['cli_json'] = False
@@ -177,6 +327,8 @@ def parse_cmdline_arguments():
     user_args['raw_dump'] = args.raw_dump
     user_args['utcoh'] = args.utcoh
     user_args['utcom'] = args.utcom
+    user_args['max_workers'] = max(1, args.max_workers)
+    user_args['token_ttl'] = args.token_ttl
 
     global INPUT_FILE_PREFIX
     INPUT_FILE_PREFIX = \
@@ -196,6 +348,8 @@ def setup_logging():
         # Log in local directory if can't be created in LOGFILE_LOCATION
         logfile_prefix = FILENAME_PREFIX
     finally:
+        global TOKEN_FILE_PREFIX
+        TOKEN_FILE_PREFIX = logfile_prefix + '_' + INPUT_FILE_PREFIX
         logfile_name = logfile_prefix + '_' + INPUT_FILE_PREFIX + '.log'
         rotator = RotatingFileHandler(logfile_name, maxBytes=LOGFILE_SIZE,
                                       backupCount=LOGFILE_NUMBER)
@@ -211,6 +365,15 @@ def setup_logging():
         if user_args.get('most_verbose') or user_args.get('raw_dump'):
             logger.setLevel(logging.DEBUG)
 
+        global SSH_CONTROL_PREFIX
+        ssh_control_prefix = os.path.dirname(os.path.abspath(logfile_name)) + \
+                             '/ssh-'
+        if len(ssh_control_prefix) <= SSH_CONTROL_PREFIX_MAX:
+            SSH_CONTROL_PREFIX = ssh_control_prefix
+        else:
+            logger.warning('Not sharing ssh connections. Path too long for ' \
+                           'a socket:%s', ssh_control_prefix)
+
 ###############################################################################
 # END: Generic functions
 ###############################################################################
@@ -219,6 +382,44 @@ def setup_logging():
 # BEGIN: Output functions
 ###############################################################################
 
+def get_ns_str_from_datetime(dt):
+    """
+    Return nanoseconds since epoch as string for an InfluxDB timestamp.
+    Integer math on the timedelta, no float rounding of timestamp().
+    Like timestamp(), a naive datetime is taken as local time
+    """
+    if dt.tzinfo is None:
+        dt = dt.astimezone(timezone.utc)
+    delta = dt - EPOCH
+    usecs = (delta.days * 86400 + delta.seconds) * 1000000 + \
+            delta.microseconds
+    return str(usecs * 1000)
+
+def get_datetime_from_peak_time(peak_time):
+    """
+    Return naive datetime for a burst peak-time like
+    2024/04/30 09:05:33:777848. The format is fixed width, so slice it
+    instead of calling strptime. Anything else goes to strptime
+    """
+    if len(peak_time) == 26 and peak_time[4:20:3] == '// :::':
+        parts = (peak_time[0:4], peak_time[5:7], peak_time[8:10],
+                 peak_time[11:13], peak_time[14:16], peak_time[17:19],
+                 peak_time[20:26])
+        if ''.join(parts).isdecimal():
+            try:
+                return datetime(*map(int, parts))
+            except ValueError:
+                pass
+    return datetime.strptime(peak_time, PEAK_TIME_FORMAT)
+
+def sorted_tags(tag_list):
+    """
+    Return the InfluxDB tags in tag_list, a list of (key, value), as
+    ,key=value string in sorted order of keys. Empty tags are skipped
+    """
+    tag_list.sort(key=itemgetter(0))
+    return ''.join([f',{key}={val}' for key, val in tag_list if val != ''])
+
 def print_output_in_influxdb_lp(switch_ip, per_switch_stats_dict):
     """
     InfluxDB Line Protocol Reference
@@ -231,7 +432,14 @@ def print_output_in_influxdb_lp(switch_ip, per_switch_stats_dict):
         * Performance tips: sort by tag key
     e.g: Measurement,tag1=tag1val,tag2=tag2val Field1="testData",Field2=3 ts_ns
     """
-    final_print_string = ''
+    # Every line is built as a list of fragments and joined once. Repeated
+    # string concatenation copies the growing string every time.
+    # Each completed line is written to stdout right away instead of holding
+    # the whole output of the switch in memory. Telegraf reads it line by line
+    # Lines are encoded and written to the binary buffer of stdout, which skips
+    # the text layer. Flush it first to keep anything already printed in order
+    sys.stdout.flush()
+    write = sys.stdout.buffer.write
     switch_prefix = 'Switches'
     buffer_prefix = 'SwitchBufferStats'
     intf_prefix = 'SwitchIntfStats'
@@ -240,299 +448,237 @@ def print_output_in_influxdb_lp(switch_ip, per_switch_stats_dict):
     burst_prefix = 'SwitchBurst'
     sys_ver = ''
 
-    switch_tags = ''
-    switch_fields = ''
-
+    # Tags common to all measurements of this switch. Build them once
+    # instead of looking them up again for every interface and queue
+    loc_tag = ''
+    sname_tag = ''
+    type_tag = ''
+    switch_tag = f',switch={switch_ip}'
     if 'location' in per_switch_stats_dict:
-        switch_tags = switch_tags + ',location=' + \
-                      per_switch_stats_dict['location']
+        loc_tag = f",location={per_switch_stats_dict['location']}"
+    if 'switchname' in per_switch_stats_dict:
+        sname_tag = f",switchname={per_switch_stats_dict['switchname']}"
+    if 'type' in per_switch_stats_dict:
+        type_tag = f",type={per_switch_stats_dict['type']}"
 
-    switch_tags = switch_tags + ',switch=' + switch_ip
+    # Interface and queue lines mix these with per interface tags. Keep them
+    # as (key, value) so that all their tags can be sorted by sorted_tags()
+    common_tag_list = [('switch', switch_ip)]
+    for key in ('location', 'switchname', 'type'):
+        if key in per_switch_stats_dict:
+            common_tag_list.append((key, per_switch_stats_dict[key]))
 
-    if 'switchname' in per_switch_stats_dict:
-        switch_tags = switch_tags + ',switchname=' + \
-                      per_switch_stats_dict['switchname']
+    # Tail of tags that is identical for every line of a measurement
+    switch_tail = f'{switch_tag}{sname_tag}{type_tag}'
+    wd_tail = f'{switch_tag}{sname_tag}'
 
-    if 'type' in per_switch_stats_dict:
-        switch_tags = switch_tags + ',type=' + \
-                      per_switch_stats_dict['type']
+    switch_tags = [loc_tag, switch_tail]
+    switch_fields = []
 
     if 'response_time' in per_switch_stats_dict:
-        switch_fields = switch_fields + ' response_time=' + \
-                        str(per_switch_stats_dict['response_time'])
+        switch_fields.append( \
+                    f" response_time={per_switch_stats_dict['response_time']}")
 
     if 'model' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',model="' + \
-                        per_switch_stats_dict['model'] + '"'
+        switch_fields.append(f",model=\"{per_switch_stats_dict['model']}\"")
 
     if 'cpu_kernel' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',cpu_kernel=' + \
-                        str(per_switch_stats_dict['cpu_kernel'])
+        switch_fields.append( \
+                    f",cpu_kernel={per_switch_stats_dict['cpu_kernel']}")
 
     if 'cpu_user' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',cpu_user=' + \
-                        str(per_switch_stats_dict['cpu_user'])
+        switch_fields.append(f",cpu_user={per_switch_stats_dict['cpu_user']}")
 
     if 'mem_total' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',mem_total=' + \
-                        str(per_switch_stats_dict['mem_total'])
+        switch_fields.append( \
+                    f",mem_total={per_switch_stats_dict['mem_total']}")
 
     if 'mem_used' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',mem_used=' + \
-                        str(per_switch_stats_dict['mem_used'])
+        switch_fields.append(f",mem_used={per_switch_stats_dict['mem_used']}")
 
     if 'sys_ver' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',sys_ver="' + \
-                        per_switch_stats_dict['sys_ver'] + '"'
         sys_ver = per_switch_stats_dict['sys_ver']
+        switch_fields.append(f',sys_ver="{sys_ver}"')
 
     if 'kernel_uptime' in per_switch_stats_dict:
-        switch_fields = switch_fields + ',kernel_uptime=' + \
-                        str(per_switch_stats_dict['kernel_uptime'])
+        switch_fields.append( \
+                    f",kernel_uptime={per_switch_stats_dict['kernel_uptime']}")
 
-    switch_fields = switch_fields + '\n'
-    final_print_string = final_print_string + switch_prefix + \
-                         switch_tags + switch_fields
+    switch_fields.append('\n')
+    write(f"{switch_prefix}{''.join(switch_tags)}{''.join(switch_fields)}".encode())
 
     if 'buffer_usage' in per_switch_stats_dict:
         for instance,instance_dict in \
                 per_switch_stats_dict['buffer_usage'].items():
-            buffer_tags = ''
-            buffer_fields = ''
-            buffer_tags = ',instance=' + str(instance)
-            if 'location' in per_switch_stats_dict:
-                buffer_tags = buffer_tags + ',location=' + \
-                              per_switch_stats_dict['location']
-
-            buffer_tags = buffer_tags + ',switch=' + switch_ip
-
-            if 'switchname' in per_switch_stats_dict:
-                buffer_tags = buffer_tags + ',switchname=' + \
-                              per_switch_stats_dict['switchname']
-
-            if 'type' in per_switch_stats_dict:
-                buffer_tags = buffer_tags + ',type=' + \
-                              per_switch_stats_dict['type']
+            buffer_tags = [f',instance={instance}', loc_tag, switch_tail]
+            buffer_fields = []
             if 'peak_cell_drop_pg' in instance_dict:
-                buffer_fields = buffer_fields + ' peak_cell_drop_pg=' + \
-                                str(instance_dict['peak_cell_drop_pg'])
+                buffer_fields.append( \
+                    f" peak_cell_drop_pg={instance_dict['peak_cell_drop_pg']}")
             if 'peak_cell_no_drop' in instance_dict:
-                buffer_fields = buffer_fields + ',peak_cell_no_drop=' + \
-                                str(instance_dict['peak_cell_no_drop'])
+                buffer_fields.append( \
+                    f",peak_cell_no_drop={instance_dict['peak_cell_no_drop']}")
             if 'cell_count_drop_pg' in instance_dict:
-                buffer_fields = buffer_fields + ',cell_count_drop_pg=' + \
-                                str(instance_dict['cell_count_drop_pg'])
+                buffer_fields.append( \
+                    f",cell_count_drop_pg={instance_dict['cell_count_drop_pg']}")
             if 'cell_count_no_drop_pg' in instance_dict:
-                buffer_fields = buffer_fields + ',cell_count_no_drop_pg=' + \
-                                str(instance_dict['cell_count_no_drop_pg'])
+                buffer_fields.append(',cell_count_no_drop_pg=' \
+                    f"{instance_dict['cell_count_no_drop_pg']}")
 
-            buffer_fields = buffer_fields + '\n'
-            final_print_string = final_print_string + buffer_prefix + \
-                                 buffer_tags + buffer_fields
+            buffer_fields.append('\n')
+            write(f"{buffer_prefix}{''.join(buffer_tags)}" \
+                  f"{''.join(buffer_fields)}".encode())
 
-    intf_str = ''
-    q_str = ''
-    wd_str = ''
-    burst_str = ''
     intf_dict = per_switch_stats_dict['intf']
     utclog = True
 
+    # CSCwk10807. Timezone adjustment not needed 10.5(1) onwards
+    # Decide once per switch instead of once per interface
+    needs_tz_adjust = bool(sys_ver) and sys_ver < '10.5(1)'
+    utc_offset = None
+    if needs_tz_adjust and user_args['utcoh'] is not None:
+        utcoh = int(user_args['utcoh'])
+        if user_args['utcom'] is not None:
+            utcom = int(user_args['utcom'])
+        else:
+            utcom = 0
+        utc_offset = timedelta(hours=utcoh, minutes=utcom)
+
     for intf, per_intf_dict in intf_dict.items():
-        intf_tags = ''
-        intf_fields = ''
+        intf_tag_list = common_tag_list + [('intf', intf)]
+        intf_fields = []
         ts_ns_i = ''
-
-        if 'location' in per_switch_stats_dict:
-            intf_tags = intf_tags + ',location=' + \
-                      per_switch_stats_dict['location']
-
-        if 'meta' in per_intf_dict.keys():
-            for key, val in sorted((per_intf_dict['meta']).items()):
-                # Avoid null tags
-                if str(val) == '':
-                    continue
-                if str(key) == 'modTs':
-                    # TODO: Update this as per timezone
-                    # CSCwk10807. Timezone adjustment not needed 10.5(1) onwards
-                    #utc = datetime.fromisoformat(str(val)) + timedelta(hours=7)
-                    if sys_ver == '':
-                        utc = datetime.fromisoformat(str(val))
+        # Look up every sub-dict of the interface only once
+        meta_dict = per_intf_dict.get('meta')
+        data_dict = per_intf_dict.get('data')
+        q_dict = per_intf_dict.get('out_queue')
+        pfcwd_dict = per_intf_dict.get('pfcwd')
+        burst_list = per_intf_dict.get('burst')
+
+        if meta_dict:
+            for key, val in meta_dict.items():
+                if key != 'modTs':
+                    intf_tag_list.append((key, val))
+
+            val = meta_dict.get('modTs')
+            if val:
+                utc = datetime.fromisoformat(val)
+                if needs_tz_adjust:
+                    if utc_offset is None:
+                        if utclog:
+                            # Print log only once
+                            logger.warning('Required utcoh for Switch' \
+                            ' running NX-OS version %s', sys_ver)
+                            utclog = False
                     else:
-                        if sys_ver < '10.5(1)':
-                            if user_args['utcoh'] is None:
-                                utc = datetime.fromisoformat(str(val))
-                                if utclog:
-                                    # Print log only once
-                                    logger.warning('Required utcoh for Switch' \
-                                    ' running NX-OS version %s', sys_ver)
-                                    utclog = False
-                            else:
-                                utcoh = int(user_args['utcoh'])
-                                if user_args['utcom'] is not None:
-                                    utcom = int(user_args['utcom'])
-                                else:
-                                    utcom = 0
-                                utc = datetime.fromisoformat(str(val)) + \
-                                        timedelta(hours=utcoh, minutes=utcom)
-                                if utclog:
-                                    # Print log only once
-                                    logger.info('Writing to InfluxDB ' \
-                                    ' after adjusting UTC offset of %d %d', \
-                                    utcoh, utcom)
-                                    utclog = False
-                        else:
-                            utc = datetime.fromisoformat(str(val))
-                    # "2024-05-18T18:04:19.900+00:00"
-                    # switch returns ms. write with us. Keep ns to 1000
-                    ts_ns_i = str(int(datetime.timestamp(utc) * 1000000) * 1000)
-                    continue
-                intf_tags = intf_tags + ',' + key + '=' + str(val)
-
-        intf_tags = intf_tags + ',switch=' + switch_ip + \
-                    ',intf=' + intf
-
-        if 'switchname' in per_switch_stats_dict:
-            intf_tags = intf_tags + ',switchname=' + \
-                            str(per_switch_stats_dict['switchname'])
-
-        if 'type' in per_switch_stats_dict:
-            intf_tags = intf_tags + ',type=' + \
-                          per_switch_stats_dict['type']
-
-        if 'data' in per_intf_dict.keys():
-            for key, val in sorted((per_intf_dict['data']).items()):
-                sep = ' ' if intf_fields == '' else ','
+                        utc = utc + utc_offset
+                        if utclog:
+                            # Print log only once
+                            logger.info('Writing to InfluxDB ' \
+                            ' after adjusting UTC offset of %d %d', \
+                            utcoh, utcom)
+                            utclog = False
+                # "2024-05-18T18:04:19.900+00:00"
+                # switch returns ms. write with us. Keep ns to 1000
+                ts_ns_i = get_ns_str_from_datetime(utc)
+
+        if data_dict:
+            first_field = True
+            # Field order does not matter to InfluxDB. Keep parser order
+            for key, val in data_dict.items():
                 if val is None:
                     logger.warning('Skipping empty field %s for %s %s',
                             key, switch_ip, intf)
                     continue
+                sep = ' ' if first_field else ','
+                first_field = False
 
                 if key in ('description', 'down_reason'):
-                    intf_fields = intf_fields + sep + key + '="' + str(val) + '"'
+                    intf_fields.append(f'{sep}{key}="{val}"')
                 else:
-                    intf_fields = intf_fields + sep + key + '=' + str(val)
-
-        ts_ns_i = ' ' + ts_ns_i + '\n'
-        intf_str = intf_str + intf_prefix + intf_tags + intf_fields + ts_ns_i
-
-        if 'out_queue' in per_intf_dict.keys():
-            q_dict = per_intf_dict['out_queue']
+                    intf_fields.append(f'{sep}{key}={val}')
+
+        intf_fields.append(f' {ts_ns_i}\n')
+        write(f"{intf_prefix}{sorted_tags(intf_tag_list)}" \
+              f"{''.join(intf_fields)}".encode())
+
+        if q_dict:
+            peer_tag_list = common_tag_list + [('intf', intf)]
+            if meta_dict:
+                for key in ('peer', 'peer_intf', 'peer_name', 'peer_type'):
+                    if key in meta_dict:
+                        peer_tag_list.append((key, meta_dict[key]))
+            # Only the q tag changes between queues. Sort the rest once and
+            # split it around where q belongs
+            q_head = sorted_tags([t for t in peer_tag_list if t[0] < 'q'])
+            q_tail = sorted_tags([t for t in peer_tag_list if t[0] > 'q'])
             for q_name, per_q_dict in q_dict.items():
-                q_tags = ''
-                q_fields = ''
+                q_tags = f'{q_head},q={q_name}{q_tail}'
+                q_fields = []
                 ts_ns_q = ''
 
-                q_tags = q_tags + ',intf=' + intf
-
-                if 'location' in per_switch_stats_dict:
-                    q_tags = q_tags + ',location=' + \
-                          per_switch_stats_dict['location']
-
-                if 'meta' in per_intf_dict.keys():
-                    if 'peer' in per_intf_dict['meta']:
-                        q_tags = q_tags + ',peer=' + per_intf_dict['meta']['peer']
-                    if 'peer_intf' in per_intf_dict['meta']:
-                        q_tags = q_tags + ',peer_intf=' + \
-                                 per_intf_dict['meta']['peer_intf']
-                    if 'peer_name' in per_intf_dict['meta']:
-                        q_tags = q_tags + ',peer_name=' + \
-                                 per_intf_dict['meta']['peer_name']
-                    if 'peer_type' in per_intf_dict['meta']:
-                        q_tags = q_tags + ',peer_type=' + \
-                                 per_intf_dict['meta']['peer_type']
-
-                if 'switchname' in per_switch_stats_dict:
-                    q_tags = q_tags + ',switchname=' + \
-                                str(per_switch_stats_dict['switchname'])
-
-                q_tags = q_tags + ',q=' + q_name
-                q_tags = q_tags + ',switch=' + switch_ip
-
-                if 'type' in per_switch_stats_dict:
-                    q_tags = q_tags + ',type=' + \
-                              per_switch_stats_dict['type']
-                for key, val in sorted(per_q_dict.items()):
+                first_field = True
+                for key, val in per_q_dict.items():
                     if val is None:
                         logger.warning('Skipping empty field %s for %s %s %s',
                                 key, switch_ip, intf, q_name)
                         continue
-                    if str(key) == 'modTs':
-                        # TODO: Update this as per timezone
-                        utc = datetime.fromisoformat(str(val)) + \
-                                                    timedelta(hours=7)
+                    if key == 'modTs':
+                        utc = datetime.fromisoformat(val) + QUEUE_MODTS_OFFSET
                         # "2024-05-18T18:04:19.900+00:00"
                         # switch returns ms. write with us  . Keep ns to 1000
-                        ts_ns_q = str(int(datetime.timestamp(utc) * 1000000) \
-                                                                     * 1000)
+                        ts_ns_q = get_ns_str_from_datetime(utc)
                         continue
 
-                    sep = ' ' if q_fields == '' else ','
-                    q_fields = q_fields + sep + key + '=' + str(val)
-                #ts_ns_q = ' ' + ts_ns_q + '\n'
-                q_fields = q_fields + '\n'
-                #q_str = q_str + q_prefix + q_tags + q_fields + ts_ns_q
-                q_str = q_str + q_prefix + q_tags + q_fields
+                    sep = ' ' if first_field else ','
+                    first_field = False
+                    q_fields.append(f'{sep}{key}={val}')
+                #q_fields.append(f' {ts_ns_q}')
+                q_fields.append('\n')
+                write(f"{q_prefix}{q_tags}{''.join(q_fields)}".encode())
 
-        if 'pfcwd' in per_intf_dict.keys():
-            pfcwd_dict = per_intf_dict['pfcwd']
+        if pfcwd_dict is not None:
             if not pfcwd_dict:
                 # Skip interfaces returning no data for PFC WD
                 continue
             for k,v in pfcwd_dict.items():
-                wd_tags = ',intf=' + intf
-                wd_fields = ''
-                if 'location' in per_switch_stats_dict:
-                    wd_tags = wd_tags + ',location=' + \
-                                    per_switch_stats_dict['location']
-                wd_tags = wd_tags + ',' + 'qosgrp'  + '=' + str(k)
+                wd_tags = f',intf={intf}{loc_tag},qosgrp={k}{wd_tail}'
+                wd_fields = []
+                first_field = True
                 for key,val in v.items():
-                    sep = ' ' if wd_fields == '' else ','
-                    wd_fields = wd_fields + sep + key + '=' + str(val)
-                wd_tags = wd_tags + ',switch=' + switch_ip
-                if 'switchname' in per_switch_stats_dict:
-                    wd_tags = wd_tags + ',switchname=' + \
-                            str(per_switch_stats_dict['switchname'])
-                wd_fields = wd_fields + '\n'
-                wd_str = wd_str + wd_prefix + wd_tags + wd_fields
-
-        if 'burst' in per_intf_dict.keys():
-            burst_list = per_intf_dict['burst']
+                    sep = ' ' if first_field else ','
+                    first_field = False
+                    wd_fields.append(f'{sep}{key}={val}')
+                wd_fields.append('\n')
+                write(f"{wd_prefix}{wd_tags}{''.join(wd_fields)}".encode())
+
+        if burst_list:
             for burst_dict in burst_list:
-                burst_tags = ',intf=' + intf
-                burst_fields = ''
+                burst_tags = [f',intf={intf}', loc_tag]
+                burst_fields = []
                 ts_ns_b = ''
-                if 'location' in per_switch_stats_dict:
-                    burst_tags = burst_tags + ',location=' + \
-                                            per_switch_stats_dict['location']
+                first_field = True
                 for k,v in burst_dict.items():
                     if 'q' in k:
-                        burst_tags = burst_tags + ',' + str(k) + '=' + str(v)
+                        burst_tags.append(f',{k}={v}')
                     elif 'peak-time' in k:
                         # "peak-time": "2024/04/30 09:05:33:777848",
-                        format_str = '%Y/%m/%d %H:%M:%S:%f'
-                        utc = datetime.strptime(v, format_str)
-                        # Multiple by 1000 after converting to decimal to ensure that
-                        # last 3 dights are 0 and the point remains unchanged
-                        # This ensures that the burst event is overwritten in InfluxDB
-                        ts_ns_b = str(int(datetime.timestamp(utc) * 1000000) * 1000)
+                        utc = get_datetime_from_peak_time(v)
+                        # Keep last 3 digits of ns 0 so that the point remains
+                        # unchanged. This ensures that the burst event is
+                        # overwritten in InfluxDB
+                        ts_ns_b = get_ns_str_from_datetime(utc)
                     else:
-                        sep = ' ' if burst_fields == '' else ','
-                        burst_fields = burst_fields + sep + k + '=' + str(v)
+                        sep = ' ' if first_field else ','
+                        first_field = False
+                        burst_fields.append(f'{sep}{k}={v}')
 
-                burst_tags = burst_tags + ',switch=' + switch_ip
-                if 'switchname' in per_switch_stats_dict:
-                    burst_tags = burst_tags + ',switchname=' + \
-                                str(per_switch_stats_dict['switchname'])
-                ts_ns_b = ' ' + ts_ns_b + '\n'
-                burst_str = burst_str + burst_prefix + burst_tags + \
-                            burst_fields + ts_ns_b
+                burst_tags.append(wd_tail)
+                burst_fields.append(f' {ts_ns_b}\n')
+                write(f"{burst_prefix}{''.join(burst_tags)}" \
+                      f"{''.join(burst_fields)}".encode())
 
-    final_print_string = final_print_string + intf_str
-    final_print_string = final_print_string + q_str
-    final_print_string = final_print_string + wd_str
-    final_print_string = final_print_string + burst_str
-
-    print(final_print_string)
+    write(b'\n')
 
 
 def print_output(switch_ip, per_switch_stats_dict):
@@ -566,10 +712,16 @@ def get_float_from_string(s):
     """
     Clean up function for dirty data. Used for transceiver stats like
     current, voltage, etc.
+    Fast path without regex for a plain number with an optional unit, like
+    100G, 3.3 or 100 Gbps. Everything else goes through FLOAT_RE
     """
-    ret = ''.join(re.findall(r"[-+]?\d*\.\d+|\d+", s))
+    num = s.rstrip(UNIT_CHARS)
+    if num and num.replace('.', '', 1).isdecimal():
+        return float(num)
+
+    ret = ''.join(FLOAT_RE.findall(s))
 
-    if len(ret) == 0:
+    if not ret:
         return 0
 
     return float(ret)
@@ -579,361 +731,193 @@ def get_speed_num_from_string(speed):
     Just retain the number in gbps. 100 Gbps => 100, 400Gbps => 400
     strip off gbps, etc.
     """
-    if speed.isdigit():
-        return (int)(speed)
-
-    return (int)(get_float_from_string(speed))
+    try:
+        return int(speed)
+    except ValueError:
+        return (int)(get_float_from_string(speed))
 
-def parse_intf(imdata_list, per_switch_stats_dict, mo):
-    """Extract mostly the metadata for the interfaces"""
-    intf_dict = per_switch_stats_dict['intf']
+def iter_intf_attributes(imdata_list, mo, intf_dict, intf_from_dn=True):
+    """
+    Common walk of the imdata returned for interface MOs. Yields attributes
+    of every MO and the dict of its interface in intf_dict, skipping mgmt,
+    loopback, svi and sub-interfaces. Interface is taken from dn, or from
+    id when intf_from_dn is False. Interfaces already in intf_dict passed
+    the skip check for an earlier MO and are not checked again
+    """
     for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
+        # imdata is {mo: {'attributes': {...}}}
+        for attr in imdata.values():
+            attributes = attr.get('attributes')
+            if attributes is None:
+                logger.error('attributes not found in response for %s:%s',
+                        mo, LazyJson(imdata_list))
+                continue
+            attributes_get = attributes.get
+            dn = attributes_get('dn')
+            if dn is None:
+                logger.error('dn not found %s:%s',
+                        mo, LazyJson(imdata_list))
+                continue
+            if intf_from_dn:
+                # sys/intf/phys-[eth1/1]/dbgEtherStats => eth1/1
+                interface = dn.partition('[')[2].partition(']')[0]
+                if not interface:
                     continue
-                if 'id' not in attributes:
+            else:
+                interface = attributes_get('id')
+                if interface is None:
                     logger.error('intf id not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
+                            mo, LazyJson(imdata_list))
+                    continue
+            '''
+            # This isn't needed because Grafana latest releases supports
+            # sorting varibale values using Natural (asc) order. But keep
+            # code just in case
+            # make single digit numbers to two digits for sorting in GUI
+            interface_list = interface.split('/')
+            if len(interface_list) > 1:
+                port_id = interface_list[-1]
+                if len(port_id) == 1:
+                    port_id = '0' + port_id
+                    interface = '/'.join(interface_list[0:-1]) + '/' + port_id
+            '''
+            per_intf_dict = intf_dict.get(interface)
+            if per_intf_dict is None:
+                if SKIP_DN_RE.search(dn):
                     continue
-                interface = attributes.get('id')
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                 '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'data' not in per_intf_dict:
-                    per_intf_dict['data'] = {}
-                data_dict = per_intf_dict['data']
-
-                data_dict['description'] = attributes.get('descr')
-
-                if 'meta' not in per_intf_dict:
-                    per_intf_dict['meta'] = {}
-                meta_dict = per_intf_dict['meta']
-
-                meta_dict['admin_state'] = attributes.get('adminSt')
-                meta_dict['oper_state'] = attributes.get('operSt')
-                meta_dict['oper_mode'] = attributes.get('mode')
+                per_intf_dict = intf_dict[interface] = {}
+            yield attributes, per_intf_dict
+
+def copy_attributes(attributes, key_map, dest_dict):
+    """Copy attributes to dest_dict as per key_map of (dest, source) keys"""
+    attributes_get = attributes.get
+    for key, attr_key in key_map:
+        dest_dict[key] = attributes_get(attr_key)
+
+def parse_intf(imdata_list, per_switch_stats_dict, mo):
+    """Extract mostly the metadata for the interfaces"""
+    intf_dict = per_switch_stats_dict['intf']
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict,
+                                 intf_from_dn=False):
+        attributes_get = attributes.get
+        descr = attributes_get('descr')
+        admin_st = attributes_get('adminSt')
+        oper_st = attributes_get('operSt')
+        mode = attributes_get('mode')
+
+        data_dict = per_intf_dict.setdefault('data', {})
+
+        data_dict['description'] = descr
+
+        meta_dict = per_intf_dict.setdefault('meta', {})
+
+        meta_dict['admin_state'] = admin_st
+        meta_dict['oper_state'] = oper_st
+        meta_dict['oper_mode'] = mode
 
 def parse_ethpmPhysIf(imdata_list, per_switch_stats_dict, mo):
     """Extract mostly the metadata for the interfaces"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'meta' not in per_intf_dict:
-                    per_intf_dict['meta'] = {}
-                meta_dict = per_intf_dict['meta']
-
-                meta_dict['oper_state'] = attributes.get('operSt')
-
-                if 'data' not in per_intf_dict:
-                    per_intf_dict['data'] = {}
-                data_dict = per_intf_dict['data']
-
-                data_dict['oper_speed'] = \
-                    get_speed_num_from_string(attributes.get('operSpeed'))
-                if 'up' not in attributes.get('operSt'):
-                    data_dict['down_reason'] = attributes.get('operStQual')
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        attributes_get = attributes.get
+        oper_st = attributes_get('operSt')
+        meta_dict = per_intf_dict.setdefault('meta', {})
+
+        meta_dict['oper_state'] = oper_st
+
+        data_dict = per_intf_dict.setdefault('data', {})
+
+        data_dict['oper_speed'] = \
+            get_speed_num_from_string(attributes_get('operSpeed'))
+        if 'up' not in oper_st:
+            data_dict['down_reason'] = attributes_get('operStQual')
 
 def parse_rmonEtherStats(imdata_list, per_switch_stats_dict, mo):
     """Extract stats for the interfaces"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'data' not in per_intf_dict:
-                    per_intf_dict['data'] = {}
-                data_dict = per_intf_dict['data']
-
-                # TODO: Need handling when an attribute is not returned,
-                # which results in None, causing error on influx field type
-                data_dict['rx_crc'] = attributes.get('cRCAlignErrors')
-                data_dict['rx_crc_stomped'] = attributes.get('stompedCRCAlignErrors')
-                data_dict['tx_jumbo'] = attributes.get('txOversizePkts')
-                data_dict['rx_jumbo'] = attributes.get('rxOversizePkts')
-                data_dict['rxPkts1024to1518Octets'] = attributes.get('rxPkts1024to1518Octets')
-                data_dict['rxPkts512to1023Octets'] = attributes.get('rxPkts512to1023Octets')
-                data_dict['rxPkts256to511Octets'] = attributes.get('rxPkts256to511Octets')
-                data_dict['rxPkts128to255Octets'] = attributes.get('rxPkts128to255Octets')
-                data_dict['rxPkts65to127Octets'] = attributes.get('rxPkts65to127Octets')
-                data_dict['rxPkts64Octets'] = attributes.get('rxPkts64Octets')
-                data_dict['txPkts1024to1518Octets'] = attributes.get('txPkts1024to1518Octets')
-                data_dict['txPkts512to1023Octets'] = attributes.get('txPkts512to1023Octets')
-                data_dict['txPkts256to511Octets'] = attributes.get('txPkts256to511Octets')
-                data_dict['txPkts128to255Octets'] = attributes.get('txPkts128to255Octets')
-                data_dict['txPkts65to127Octets'] = attributes.get('txPkts65to127Octets')
-                data_dict['txPkts64Octets'] = attributes.get('txPkts64Octets')
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        # TODO: Need handling when an attribute is not returned,
+        # which results in None, causing error on influx field type
+        copy_attributes(attributes, RMON_ETHER_STATS_KEYS,
+                        per_intf_dict.setdefault('data', {}))
 
 def parse_rmonIfHCIn(imdata_list, per_switch_stats_dict, mo):
     """Extract stats for the interfaces"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'data' not in per_intf_dict:
-                    per_intf_dict['data'] = {}
-                data_dict = per_intf_dict['data']
-                data_dict['rx_broadcast_pkts'] = attributes.get('broadcastPkts')
-                data_dict['rx_multicast_pkts'] = attributes.get('multicastPkts')
-                data_dict['rx_ucast_pkts'] = attributes.get('ucastPkts')
-                data_dict['rx_bytes'] = attributes.get('octets')
-                # modTs seems to be the same for rx and tx. Just use once
-                per_intf_dict['meta']['modTs'] = attributes.get('modTs')
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        copy_attributes(attributes, RMON_IF_HC_IN_KEYS,
+                        per_intf_dict.setdefault('data', {}))
+        # modTs seems to be the same for rx and tx. Just use once
+        per_intf_dict['meta']['modTs'] = attributes.get('modTs')
 
 def parse_rmonIfHCOut(imdata_list, per_switch_stats_dict, mo):
     """Extract stats for the interfaces"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'data' not in per_intf_dict:
-                    per_intf_dict['data'] = {}
-                data_dict = per_intf_dict['data']
-                data_dict['tx_broadcast_pkts'] = attributes.get('broadcastPkts')
-                data_dict['tx_multicast_pkts'] = attributes.get('multicastPkts')
-                data_dict['tx_ucast_pkts'] = attributes.get('ucastPkts')
-                data_dict['tx_bytes'] = attributes.get('octets')
-                # modTs seems to be the same for rx and tx. Just use once
-                #per_intf_dict['meta']['modTs'] = attributes.get('modTs')
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        copy_attributes(attributes, RMON_IF_HC_OUT_KEYS,
+                        per_intf_dict.setdefault('data', {}))
+        # modTs seems to be the same for rx and tx. Just use once
+        #per_intf_dict['meta']['modTs'] = attributes.get('modTs')
 
 def parse_ipqosQueuingStats(imdata_list, per_switch_stats_dict, mo):
     """Extract queue stats for the interfaces"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'out_queue' not in per_intf_dict:
-                    per_intf_dict['out_queue'] = {}
-                out_queue_dict = per_intf_dict['out_queue']
-
-                if 'cmapName' not in attributes:
-                    logger.error('cmapName not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                queue_name = attributes.get('cmapName')
-                if queue_name not in out_queue_dict:
-                    out_queue_dict[queue_name] = {}
-                per_out_queue_dict = out_queue_dict[queue_name]
-
-                per_out_queue_dict['tx_bytes'] = attributes.get('txBytes')
-                per_out_queue_dict['tx_pkts'] = attributes.get('txPackets')
-                per_out_queue_dict['drop_bytes'] = attributes.get('dropBytes')
-                per_out_queue_dict['drop_pkts'] = attributes.get('dropPackets')
-                per_out_queue_dict['rx_pause'] = attributes.get('pfcRxPpp')
-                per_out_queue_dict['tx_pause'] = attributes.get('pfcTxPpp')
-                per_out_queue_dict['rand_drop_bytes'] = attributes.get('randDropBytes')
-                per_out_queue_dict['rand_drop_pkts'] = attributes.get('randDropPackets')
-                per_out_queue_dict['ecn_marked_pkts'] = attributes.get('randEcnMarkedPackets')
-                per_out_queue_dict['q_depth'] = attributes.get('ucCurrQueueDepth')
-                per_out_queue_dict['modTs'] = attributes.get('modTs')
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        out_queue_dict = per_intf_dict.setdefault('out_queue', {})
+
+        queue_name = attributes.get('cmapName')
+        if queue_name is None:
+            logger.error('cmapName not found %s:%s',
+                    mo, LazyJson(imdata_list))
+            continue
+        copy_attributes(attributes, IPQOS_QUEUING_STATS_KEYS,
+                        out_queue_dict.setdefault(queue_name, {}))
 
 def parse_lldpAdjEp(imdata_list, per_switch_stats_dict, mo):
     """Extract peer details from LLDP"""
     intf_dict = per_switch_stats_dict['intf']
-    for imdata in imdata_list:
-        for mo_name, attr in imdata.items():
-            for attribute, attributes in attr.items():
-                if 'dn' not in attributes:
-                    logger.error('dn not found %s:%s',
-                            mo, json.dumps(imdata_list, indent=2))
-                    continue
-                dn = attributes.get('dn')
-                if 'mgmt' in dn or 'lo' in dn or 'svi' in dn or '.' in dn:
-                    continue
-                interface = dn[dn.find('[') + 1 : dn.find(']')]
-                '''
-                # This isn't needed because Grafana latest releases supports
-                # sorting varibale values using Natural (asc) order. But keep
-                # code just in case
-                # make single digit numbers to two digits for sorting in GUI
-                interface_list = interface.split('/')
-                if len(interface_list) > 1:
-                    port_id = interface_list[-1]
-                    if len(port_id) == 1:
-                        port_id = '0' + port_id
-                        interface = '/'.join(interface_list[0:-1]) + '/' + port_id
-                '''
-
-                if interface not in intf_dict:
-                    intf_dict[interface] = {}
-                per_intf_dict = intf_dict[interface]
-
-                if 'meta' not in per_intf_dict:
-                    per_intf_dict['meta'] = {}
-                meta_dict = per_intf_dict['meta']
-
-                encap = attributes.get('enCap')
-                sysdesc = attributes.get('sysDesc')
-                # When docker is installed, Ubuntu's encap becomes router(R)
-                # instead of station(S). So check for Linux in sysDesc
-                if 'tatio' in encap or \
-                        re.search('Linux', sysdesc, re.IGNORECASE):
-                    meta_dict['peer_type'] = 'host'
-                    # portDesc has name in portDesc format, portIdV has mac
-                    # portDesc is "Interface  28 as enp154s0d22" by lldpad
-                    # portDesc can be 'Interface  18 as enp77s0d8' or 'fabric0'
-                    portDesc = attributes.get('portDesc')
-                    # find enp, ens, fab, etc.
-                    portDesc = ''.join(re.findall("fab\w+|en\w+", portDesc))
-                    meta_dict['peer_intf'] = portDesc
-                    meta_dict['peer'] = attributes.get('mgmtIp')
-                    meta_dict['peer_name'] = attributes.get('sysName')
-                elif 'ridg' in encap or 'oute' in encap:
-                    # bridge or router
-                    meta_dict['peer_type'] = 'switch'
-                    # portIdV comes in 'Ethernet1/1' format
-                    portidv = attributes.get('portIdV')
-                    portidv1 = portidv.replace('Ethernet', 'eth')
-                    meta_dict['peer_intf'] = portidv1
-                    meta_dict['peer'] = attributes.get('mgmtIp')
-                    meta_dict['peer_name'] = attributes.get('sysName')
-                else:
-                    meta_dict['peer_type'] = 'other'
-                    # don't fill peer, peer_name, and peer_intf when peer_type is other
+    for attributes, per_intf_dict in \
+            iter_intf_attributes(imdata_list, mo, intf_dict):
+        attributes_get = attributes.get
+        meta_dict = per_intf_dict.setdefault('meta', {})
+
+        encap = attributes_get('enCap')
+        sysdesc = attributes_get('sysDesc')
+        # When docker is installed, Ubuntu's encap becomes router(R)
+        # instead of station(S). So check for Linux in sysDesc
+        if 'tatio' in encap or \
+                LINUX_RE.search(sysdesc):
+            meta_dict['peer_type'] = 'host'
+            # portDesc has name in portDesc format, portIdV has mac
+            # portDesc is "Interface  28 as enp154s0d22" by lldpad
+            # portDesc can be 'Interface  18 as enp77s0d8' or 'fabric0'
+            portDesc = attributes_get('portDesc')
+            # find enp, ens, fab, etc.
+            portDesc = ''.join(PORT_DESC_RE.findall(portDesc))
+            meta_dict['peer_intf'] = portDesc
+            meta_dict['peer'] = attributes_get('mgmtIp')
+            meta_dict['peer_name'] = attributes_get('sysName')
+        elif 'ridg' in encap or 'oute' in encap:
+            # bridge or router
+            meta_dict['peer_type'] = 'switch'
+            # portIdV comes in 'Ethernet1/1' format
+            portidv = attributes_get('portIdV')
+            if portidv.startswith('Ethernet'):
+                portidv1 = 'eth' + portidv[8:]
+            else:
+                portidv1 = portidv
+            meta_dict['peer_intf'] = portidv1
+            meta_dict['peer'] = attributes_get('mgmtIp')
+            meta_dict['peer_name'] = attributes_get('sysName')
+        else:
+            meta_dict['peer_type'] = 'other'
+            # don't fill peer, peer_name, and peer_intf when peer_type is other
 
 def parse_sysmgrShowVersion(imdata_list, per_switch_stats_dict, mo):
     """Extract system details"""
@@ -941,24 +925,16 @@ def parse_sysmgrShowVersion(imdata_list, per_switch_stats_dict, mo):
         attr = imdata[mo]
         if 'attributes' not in attr:
             logger.error('attributes not found in response for %s:%s',
-                         mo, json.dumps(imdata_list, indent=2))
+                         mo, LazyJson(imdata_list))
             continue
         attributes = attr['attributes']
         per_switch_stats_dict['sys_ver'] = attributes.get('nxosVersion')
 
+        # 12 day(s), 3 hour(s), 4 minute(s), 5 second(s)
         ker_uptime_str = attributes.get('kernelUptime')
-        day_str = ''.join(re.findall(r'(\d+)[ ]{1,}day', ker_uptime_str))
-        days = int(get_float_from_string(day_str))
-        hr_str = ''.join(re.findall(r'(\d+)[ ]{1,}hour', ker_uptime_str))
-        hrs = int(get_float_from_string(hr_str))
-        min_str = ''.join(re.findall(r'(\d+)[ ]{1,}min', ker_uptime_str))
-        mins = int(get_float_from_string(min_str))
-        sec_str = ''.join(re.findall(r'(\d+)[ ]{1,}sec', ker_uptime_str))
-        secs = int(get_float_from_string(sec_str))
-        uptime_secs = secs + \
-                      mins * SECONDS_IN_MINUTE + \
-                      hrs * MINUTES_IN_HOUR * SECONDS_IN_MINUTE + \
-                      days * HOURS_IN_DAY  * MINUTES_IN_HOUR * SECONDS_IN_MINUTE
+        uptime_secs = 0
+        for num, unit in UPTIME_RE.findall(ker_uptime_str):
+            uptime_secs += int(num) * UPTIME_UNIT_SECS[unit]
 
         per_switch_stats_dict['kernel_uptime'] = uptime_secs
 
@@ -968,7 +944,7 @@ def parse_pieCpuUsage(imdata_list, per_switch_stats_dict, mo):
         attr = imdata[mo]
         if 'attributes' not in attr:
             logger.error('attributes not found in response for %s:%s',
-                         mo, json.dumps(imdata_list, indent=2))
+                         mo, LazyJson(imdata_list))
             continue
         attributes = attr['attributes']
         per_switch_stats_dict['cpu_user'] = attributes.get('userPercent')
@@ -980,7 +956,7 @@ def parse_nwVdc(imdata_list, per_switch_stats_dict, mo):
         attr = imdata[mo]
         if 'attributes' not in attr:
             logger.error('attributes not found in response for %s:%s',
-                         mo, json.dumps(imdata_list, indent=2))
+                         mo, LazyJson(imdata_list))
             continue
         attributes = attr['attributes']
         per_switch_stats_dict['switchname'] = attributes.get('name')
@@ -991,7 +967,7 @@ def parse_eqptCh(imdata_list, per_switch_stats_dict, mo):
         attr = imdata[mo]
         if 'attributes' not in attr:
             logger.error('attributes not found in response for %s:%s',
-                         mo, json.dumps(imdata_list, indent=2))
+                         mo, LazyJson(imdata_list))
             continue
         attributes = attr['attributes']
         per_switch_stats_dict['model'] = attributes.get('model')
@@ -1002,7 +978,7 @@ def parse_pieMemoryUsage(imdata_list, per_switch_stats_dict, mo):
         attr = imdata[mo]
         if 'attributes' not in attr:
             logger.error('attributes not found in response for %s:%s',
-                         mo, json.dumps(imdata_list, indent=2))
+                         mo, LazyJson(imdata_list))
             continue
         attributes = attr['attributes']
         per_switch_stats_dict['mem_total'] = attributes.get('memTotal')
@@ -1013,22 +989,24 @@ def parse_nxapi_common(json_data, mo):
     if "error" in json_data:
         logger.error('Error in %s\n%s', mo, json_data)
         return None
-    if "result" not in json_data:
-        logger.error('result not found in %s\n%s', mo, json_data)
-        return None
-    if json_data['result'] is None:
-        logger.warning('Null result in %s\n%s', mo, json_data)
-        return None
-    if "body" not in json_data['result']:
-        logger.error('body not found in %s\n%s', mo, json_data)
-        return None
-    if "TABLE_module" not in json_data['result']['body']:
-        logger.error('TABLE_module not found in %s\n%s', mo, json_data)
-        return None
-    if "ROW_module" not in json_data['result']['body']['TABLE_module']:
-        logger.error('ROW_module not found in %s\n%s', mo, json_data)
+    # Index straight down to ROW_module. key is the level being looked up.
+    # A level that is not a dict, like the plain text output of a show
+    # command without | json, raises TypeError instead of KeyError
+    key = 'result'
+    try:
+        result = json_data[key]
+        if result is None:
+            logger.warning('Null result in %s\n%s', mo, json_data)
+            return None
+        key = 'body'
+        body = result[key]
+        key = 'TABLE_module'
+        table = body[key]
+        key = 'ROW_module'
+        return table[key]
+    except (KeyError, TypeError):
+        logger.error('%s not found in %s\n%s', key, mo, json_data)
         return None
-    return json_data['result']['body']['TABLE_module']['ROW_module']
 
 def parse_pfcqueuedetail(cmd_result, per_switch_stats_dict, mo):
     """Parser for show queuing pfc-queue details in json. This is a dirty
@@ -1036,14 +1014,11 @@ def parse_pfcqueuedetail(cmd_result, per_switch_stats_dict, mo):
     This function assumes that per_intf_dict is already built
     PFC watchdog stats
     """
-    json_data = json.loads(cmd_result)
+    json_data = json_loads(cmd_result)
 
     if user_args.get('raw_dump'):
-        current_log_level = logger.level
-        logger.setLevel(logging.DEBUG)
-        logger.debug('Printing raw Response\n%s', json.dumps(json_data, indent=2))
+        logger.debug('Printing raw Response\n%s', LazyJson(json_data))
         logger.debug('Printing raw dump - DONE')
-        logger.setLevel(current_log_level)
 
     intf_dict = per_switch_stats_dict['intf']
     if "TABLE_module" not in json_data:
@@ -1066,8 +1041,10 @@ def parse_pfcqueuedetail(cmd_result, per_switch_stats_dict, mo):
         for k,v in row.items():
             if 'if_name_str' in k and 'Eth' in v:
                 # non-greedy match (?) from Ethernet1/1/1 Interface PFC watchdo
-                intf = ''.join(re.findall(r'(Eth.*?)[ ]', v, re.IGNORECASE))
-                intf = intf.strip().replace('Ethernet', 'eth')
+                intf = ''.join(PFCWD_INTF_RE.findall(v))
+                intf = intf.strip()
+                if intf.startswith('Ethernet'):
+                    intf = 'eth' + intf[8:]
                 per_intf_dict = intf_dict[intf]
                 per_intf_dict['pfcwd'] = {}
                 wd_dict = per_intf_dict['pfcwd']
@@ -1076,8 +1053,8 @@ def parse_pfcqueuedetail(cmd_result, per_switch_stats_dict, mo):
                     for rq in v['ROW_qosgrp_stats']:
                         if 'eq-qosgrp' in rq:
                             #wd_dict['qosgrp'] = str(rq['eq-qosgrp'])
-                            qosgrp = ''.join(re.findall(r'([0-9]) ', \
-                                    str(rq['eq-qosgrp']), re.IGNORECASE))
+                            qosgrp = ''.join(PFCWD_QOSGRP_RE.findall( \
+                                    str(rq['eq-qosgrp'])))
                             wd_dict[qosgrp] = {}
                         else:
                             logger.error('Not found eq-qosgrp for %s \n%s', \
@@ -1118,9 +1095,7 @@ def parse_burstdetect(json_data, per_switch_stats_dict, mo):
             continue
         intf = row_dict['if-str'].lower()
         per_intf_dict = intf_dict[intf]
-        if 'burst' not in per_intf_dict:
-            per_intf_dict['burst'] = []
-        b_list = per_intf_dict['burst']
+        b_list = per_intf_dict.setdefault('burst', [])
         b_dict = {}
         if 'queue' in row_dict:
             b_dict['q'] = row_dict['queue']
@@ -1133,20 +1108,16 @@ def parse_burstdetect(json_data, per_switch_stats_dict, mo):
         if 'peak-time' in row_dict:
             b_dict['peak-time'] = row_dict['peak-time']
         if 'duration' in row_dict:
-            if 'us' in row_dict['duration']:
-                # parse "206.46 us"
-                dur_us = (row_dict['duration']).replace('us', '').strip()
-            elif 'ms' in row_dict['duration']:
-                # parse "1.47 ms"
-                dur_ms = (row_dict['duration']).replace('ms', '').strip()
-                dur_us = str(int(float(dur_ms) * 1000))
-            elif 's' in row_dict['duration']:
-                # Must be after us and ms checks
-                dur_s = (row_dict['duration']).replace('s', '').strip()
-                dur_us = str(int(float(dur_s) * 1000000))
-            else:
+            match = DURATION_RE.fullmatch(row_dict['duration'])
+            if match is None:
                 logger.error('Unknown duration unit %s', row_dict)
                 continue
+            dur, unit = match.groups()
+            if unit == 'us':
+                # "206.46 us" is kept as is
+                dur_us = dur
+            else:
+                dur_us = str(int(float(dur) * DURATION_US_FACTOR[unit]))
             b_dict['duration'] = dur_us
         b_list.append(b_dict)
 
@@ -1156,14 +1127,11 @@ def parse_bufferpktstats(cmd_result, per_switch_stats_dict, mo):
     This information is unavailable via DME.
     """
 
-    json_data = json.loads(cmd_result)
+    json_data = json_loads(cmd_result)
 
     if user_args.get('raw_dump'):
-        current_log_level = logger.level
-        logger.setLevel(logging.DEBUG)
-        logger.debug('Printing raw Response\n%s', json.dumps(json_data, indent=2))
+        logger.debug('Printing raw Response\n%s', LazyJson(json_data))
         logger.debug('Printing raw dump - DONE')
-        logger.setLevel(current_log_level)
 
     intf_dict = per_switch_stats_dict['intf']
     if "TABLE_module" not in json_data:
@@ -1183,32 +1151,21 @@ def parse_bufferpktstats(cmd_result, per_switch_stats_dict, mo):
         logger.error('ROW_instance not in %s\n%s', mo, json_data)
         return
 
-    if 'buffer_usage' not in per_switch_stats_dict:
-        per_switch_stats_dict['buffer_usage'] = {}
-    buffer_dict = per_switch_stats_dict['buffer_usage']
+    buffer_dict = per_switch_stats_dict.setdefault('buffer_usage', {})
 
     for row_dict in row_module['TABLE_instance']['ROW_instance']:
         if 'instance' not in row_dict:
             logger.error('Instance not found for buffer pkt stats %s\n%s' \
                          , mo, json_data)
             continue
-        buffer_dict[row_dict['instance']] = {}
-        if 'max_cell_usage_drop_pg' in row_dict and \
-                'N' not in str(row_dict['max_cell_usage_drop_pg']):
-            buffer_dict[row_dict['instance']]['peak_cell_drop_pg'] = \
-                                            row_dict['max_cell_usage_drop_pg']
-        if 'max_cell_usage_no_drop_pg' in row_dict and \
-                'N' not in str(row_dict['max_cell_usage_no_drop_pg']):
-            buffer_dict[row_dict['instance']]['peak_cell_no_drop'] = \
-                                            row_dict['max_cell_usage_no_drop_pg']
-        if 'switch_cell_count_drop_pg' in row_dict and \
-                'N' not in str(row_dict['switch_cell_count_drop_pg']):
-            buffer_dict[row_dict['instance']]['cell_count_drop_pg'] = \
-                                            row_dict['switch_cell_count_drop_pg']
-        if 'switch_cell_count_no_drop_pg' in row_dict and \
-                'N' not in str(row_dict['switch_cell_count_no_drop_pg']):
-            buffer_dict[row_dict['instance']]['cell_count_no_drop_pg'] = \
-                                            row_dict['switch_cell_count_no_drop_pg']
+        instance_dict = {}
+        row_get = row_dict.get
+        for key, row_key in BUFFER_PKT_STATS_KEYS:
+            val = row_get(row_key)
+            # Skip missing values and N/A
+            if val is not None and 'N' not in str(val):
+                instance_dict[key] = val
+        buffer_dict[row_dict['instance']] = instance_dict
 
 def parse_nothing(cmd_result, per_switch_stats_dict, mo):
     """parse nothing"""
@@ -1241,34 +1198,38 @@ def get_switches():
     global response_time_dict
     location = ''
     input_file = user_args['input_file']
-    with open(input_file, 'r') as f:
-        for line in f:
-            if not line.startswith('#'):
-                line = line.strip()
-                if line.startswith('['):
+    with open(input_file, 'r', newline='') as f:
+        # QUOTE_NONE splits on every comma and keeps quotes, like a password
+        # with a quote, as they are
+        for switch in csv.reader(f, quoting=csv.QUOTE_NONE):
+            if not switch or not switch[0].startswith('#'):
+                if switch:
+                    # Leading and trailing whitespace of the line
+                    switch[0] = switch[0].lstrip()
+                    switch[-1] = switch[-1].rstrip()
+                if switch and switch[0].startswith('['):
+                    line = ','.join(switch)
                     if not line.endswith(']'):
                         logger.error('Input file %s format error. Line starts' \
                         ' with [ but does not end with ]: %s', \
                         input_file, line)
                         return
-                    line = line.replace('[', '')
-                    line = line.replace(']', '')
-                    line = line.strip()
-                    location = line
+                    location = line.strip('[]').strip()
                     continue
 
                 if location == '':
                     logger.error('Location is mandatory in input file')
                     continue
 
-                switch = line.split(',')
                 if len(switch) < 7:
                     logger.warning('Line not in correct input format:'
                     'IP_Address,username,password,protocol,port,verify_ssl'
                     ',timeout')
                     continue
+                # verify_ssl is kept as a bool to pass to requests as is
                 switch_dict[switch[0]] = [switch[1], switch[2], switch[3],
-                                          switch[4], switch[5], switch[6]]
+                                          switch[4], switch[5] != 'False',
+                                          switch[6]]
                 switch_dscr = switch[7] if len(switch) == 8 else ''
                 logger.info('Added %s (%s) to switch dict, location:%s',
                             switch[0], switch_dscr, location)
@@ -1282,11 +1243,71 @@ def get_switches():
 
     if not switch_dict:
         logger.error('Nothing to monitor. Check input file.')
+    elif not all(switch[4] for switch in switch_dict.values()):
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        logger.debug('verify_ssl is set to False. Ignoring InsecureRequestWarning')
+
+def get_session():
+    """
+    Return a new requests.Session for one switch. Keeps the TCP/TLS
+    connection alive across login, DME MO requests and logout instead of a
+    new handshake per request
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                            pool_maxsize=DME_MAX_WORKERS)
+    session.mount('https://', adapter)
+    return session
+
+def get_token_file(switch_ip):
+    """Return the name of the token cache file of a switch"""
+    return TOKEN_FILE_PREFIX + '_' + switch_ip + '.token'
+
+def load_auth_cookie(switch_ip, username):
+    """
+    Return the auth cookie cached by an earlier run for switch_ip and
+    username. None if there is none or it is about to expire
+    """
+    try:
+        with open(get_token_file(switch_ip), 'r') as f:
+            token_dict = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if token_dict.get('user') != username:
+        return None
+    if token_dict.get('expiry', 0) - time.time() < TOKEN_EXPIRY_MARGIN:
+        return None
+    return token_dict.get('cookie')
+
+def store_auth_cookie(switch_ip, username, auth_cookie):
+    """
+    Cache the auth cookie of switch_ip for the next runs. The file is only
+    readable by the user running this file. Return False if it could not
+    be cached
+    """
+    token_file = get_token_file(switch_ip)
+    tmp_file = token_file + '.' + str(os.getpid())
+    token_dict = dict(user = username,
+                      cookie = auth_cookie,
+                      expiry = time.time() + user_args['token_ttl'])
+    try:
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(token_dict, f)
+        # Readers never see a partly written file
+        os.replace(tmp_file, token_file)
+    except OSError as excp:
+        logger.warning('Unable to cache token of %s:%s', switch_ip, excp)
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        return False
+    return True
 
-def aaa_login(username, password, switch_ip, verify_ssl, timeout):
+def aaa_login(session, username, password, switch_ip, verify_ssl, timeout):
     """
     Get auth token from N9K
-    TODO: Pickle auth key instead of login and logout every time
     """
 
     payload = {
@@ -1301,54 +1322,43 @@ def aaa_login(username, password, switch_ip, verify_ssl, timeout):
     url = "https://" + switch_ip + "/api/aaaLogin.json"
     auth_cookie = {}
 
-    if verify_ssl == 'False':
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        logger.debug('verify_ssl is set to False. Ignoring InsecureRequestWarning')
-        verify = False
-    else:
-        logger.debug('verify_ssl is set to True.')
-        verify = True
-
-    response = requests.request("POST", url, data=json.dumps(payload),
-                                verify=verify, proxies=proxies, timeout=timeout)
+    response = session.post(url, json=payload, verify=verify_ssl,
+                            proxies=proxies, timeout=timeout)
 
     if not response.ok:
         logger.error('NXAPI error from %s:%s', switch_ip, \
             response.status_code)
         return None
 
-    response_json = response.json()
+    response_json = json_loads(response.content)
 
     if user_args.get('raw_dump'):
-        current_log_level = logger.level
-        logger.setLevel(logging.DEBUG)
-        logger.debug('Printing raw Response\n%s', json.dumps(response_json, indent=2))
+        logger.debug('Printing raw Response\n%s', LazyJson(response_json))
         logger.debug('Printing raw dump - DONE')
-        logger.setLevel(current_log_level)
 
     if 'imdata' not in response_json:
         logger.error('imdata not found in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     if not response_json['imdata']:
         logger.error('Empty imdata in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     if 'aaaLogin' not in response_json['imdata'][0]:
         logger.error('aaaLogin not found in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     if 'attributes' not in response_json['imdata'][0]['aaaLogin']:
         logger.error('attributes not found in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     if 'token' not in response_json['imdata'][0]['aaaLogin']['attributes']:
         logger.error('token not found in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     token = str(response_json['imdata'][0]['aaaLogin']['attributes']['token'])
@@ -1356,7 +1366,8 @@ def aaa_login(username, password, switch_ip, verify_ssl, timeout):
 
     return auth_cookie
 
-def aaa_logout(username, switch_ip, auth_cookie, verify_ssl, timeout):
+def aaa_logout(session, username, switch_ip, auth_cookie, verify_ssl, \
+               timeout):
     """
     Logout from N9K
     """
@@ -1371,16 +1382,8 @@ def aaa_logout(username, switch_ip, auth_cookie, verify_ssl, timeout):
 
     url = "https://" + switch_ip + "/api/aaaLogout.json"
 
-    if verify_ssl == 'False':
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        logger.debug('verify_ssl is set to False. Ignoring InsecureRequestWarning')
-        verify = False
-    else:
-        logger.debug('verify_ssl is set to True.')
-        verify = True
-
-    response = requests.request("POST", url, data=json.dumps(payload),
-                                cookies=auth_cookie, verify=verify, \
+    response = session.post(url, json=payload,
+                                cookies=auth_cookie, verify=verify_ssl, \
                                 proxies=proxies, timeout=timeout)
 
     if not response.ok:
@@ -1391,56 +1394,82 @@ def aaa_logout(username, switch_ip, auth_cookie, verify_ssl, timeout):
     logger.info('Successful logout from %s', switch_ip)
 
     if user_args.get('raw_dump'):
-        response = response.json()
-        current_log_level = logger.level
-        logger.setLevel(logging.DEBUG)
-        logger.debug('Printing raw Response\n%s', json.dumps(response, indent=2))
+        response = json_loads(response.content)
+        logger.debug('Printing raw Response\n%s', LazyJson(response))
         logger.debug('Printing raw dump - DONE')
-        logger.setLevel(current_log_level)
 
-def dme_connect(switch_ip, auth_cookie, endpoint, payload, verify_ssl, timeout):
+def dme_connect(session, switch_ip, auth_cookie, endpoint, verify_ssl, timeout):
     """ Connect to a Cisco N9K switch and get the response
-    of DME object end point"""
+    of DME object end point. Raise DmeAuthError on HTTP 401 or 403"""
 
     url = "https://" + switch_ip + endpoint
-    # endpoint's format: /api/mo/sys/sysmgrShowVersion.json
-    mo = endpoint.split('/')[-1].split('.')[0]
-
-    logger.debug('Requesting URL:%s, Payload:%s', url, payload)
 
-    if verify_ssl == 'False':
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        logger.debug('verify_ssl is set to False. Ignoring InsecureRequestWarning')
-        verify = False
-    else:
-        logger.debug('verify_ssl is set to True.')
-        verify = True
+    logger.debug('Requesting URL:%s', url)
 
-    response = requests.request("GET", url, data=json.dumps(payload),
-                                cookies=auth_cookie, verify=verify,
-                                proxies=proxies, timeout=timeout)
+    response = session.get(url, cookies=auth_cookie, verify=verify_ssl,
+                           proxies=proxies, timeout=timeout)
 
     if not response.ok:
         logger.error('DME connect error from %s:%s', switch_ip, \
             response.status_code)
+        if response.status_code in (401, 403):
+            raise DmeAuthError(response.status_code)
         return None
 
-    response_json = response.json()
+    response_json = json_loads(response.content)
 
     if user_args.get('raw_dump'):
-        current_log_level = logger.level
-        logger.setLevel(logging.DEBUG)
-        logger.debug('Printing raw Response\n%s', json.dumps(response_json, indent=2))
+        logger.debug('Printing raw Response\n%s', LazyJson(response_json))
         logger.debug('Printing raw dump - DONE')
-        logger.setLevel(current_log_level)
 
     if 'imdata' not in response_json:
         logger.error('imdata not found in NXAPI response from %s:%s',
-                switch_ip, json.dumps(response_json, indent=2))
+                switch_ip, LazyJson(response_json))
         return None
 
     return response_json['imdata']
 
+def timed_dme_connect(session, switch_ip, auth_cookie, endpoint, verify_ssl,
+                      timeout):
+    """
+    Run dme_connect. Return a tuple of its start time, response time,
+    imdata_list and whether the auth cookie was rejected. imdata_list is
+    None if the request fails, so that one MO failing does not lose the
+    others
+    """
+    nxapi_start = time.time()
+    mo = mo_name_dict[endpoint]
+    logger.info('Run %s on %s', mo, switch_ip)
+    auth_failed = False
+    try:
+        imdata_list = dme_connect(session, switch_ip, auth_cookie, endpoint,
+                                  verify_ssl, timeout)
+    except DmeAuthError:
+        imdata_list = None
+        auth_failed = True
+    except (requests.RequestException, ValueError) as excp:
+        logger.error('DME connect error from %s for %s:%s', switch_ip, mo,
+                     excp)
+        imdata_list = None
+    return nxapi_start, time.time(), imdata_list, auth_failed
+
+def dme_connect_all(session, switch_ip, auth_cookie, endpoints, verify_ssl,
+                    timeout):
+    """
+    Request DME endpoints of a switch concurrently over the same session.
+    The total time is close to that of the slowest endpoint instead of the
+    sum of all. Return a dictionary with key as endpoint and value as the
+    tuple returned by timed_dme_connect
+    """
+    max_workers = min(DME_MAX_WORKERS, len(endpoints))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(timed_dme_connect, session, switch_ip,
+                                   auth_cookie, endpoint, verify_ssl,
+                                   timeout)
+                   for endpoint in endpoints]
+        return {endpoint: future.result() \
+                for endpoint, future in zip(endpoints, futures)}
+
 def nxapi_connect(switch_ip, switchuser, switchpassword, cmd, verify_ssl, \
                   timeout):
     """ Connect to a Cisco N9K switch and get the response of show command
@@ -1457,9 +1486,17 @@ def nxapi_connect(switch_ip, switchuser, switchpassword, cmd, verify_ssl, \
     for password-less ssh, must have necessary permissions to run the
     commands on the local host, write access to the log directors, and
     must be able to run any daemon, such as telegraf, that invokes this file
+    All commands to a switch share one ssh connection using SSH_MUX_OPTIONS
+    and a control socket under SSH_CONTROL_PREFIX
     """
 
-    cmd_list = ['ssh', '-l', switchuser, switch_ip, cmd]
+    cmd_list = ['ssh']
+    if SSH_CONTROL_PREFIX:
+        switch_hash = hashlib.sha1((switchuser + '@' + switch_ip).encode())
+        cmd_list = cmd_list + SSH_MUX_OPTIONS + \
+                   ['-o', 'ControlPath=' + SSH_CONTROL_PREFIX + \
+                    switch_hash.hexdigest()[:16]]
+    cmd_list = cmd_list + ['-l', switchuser, switch_ip, cmd]
     result = run_cmd(cmd_list)
     if result is None:
         logger.error('Error: %s', cmd)
@@ -1531,68 +1568,142 @@ def connect_and_pull_stats(switch_ip):
     port = switch_dict[switch_ip][3]
     verify_ssl = switch_dict[switch_ip][4]
     timeout = int(switch_dict[switch_ip][5])
-    idx = 0
-    payload = None
     nxapi_ep = False
+    session = get_session()
+    token_ttl = user_args['token_ttl']
+    cached_cookie = False
+    # True if the next run can reuse the token. Else logout as usual
+    keep_token = False
 
-    for endpoint, parser in n9k_mo_dict.items():
-        nxapi_start = time.time()
-        mo = endpoint.split('/')[-1].split('.')[0]
-        if 'aaaLogin' in endpoint:
-            logger.info('Sending login request to %s', switch_ip)
-            auth_cookie = aaa_login(switchuser, switchpassword,
-                                    switch_ip, verify_ssl, timeout)
-            if auth_cookie is None:
-                logger.error('Unsuccessful auth from %s', switch_ip)
-                return
-            logger.info('Successful auth from %s', switch_ip)
-            nxapi_rsp = time.time()
-            nxapi_parse = time.time()
-            response_time = dict(nxapi_start = nxapi_start,
-                             nxapi_rsp = nxapi_rsp,
-                             nxapi_parse = nxapi_parse)
-            response_time_dict[switch_ip].insert(idx, response_time)
-            idx = idx + 1
-            continue
-        if 'aaaLogout' in endpoint:
-            logger.info('Sending logout request to %s', switch_ip)
-            aaa_logout(switchuser, switch_ip, auth_cookie, verify_ssl, timeout)
-            nxapi_rsp = time.time()
-            nxapi_parse = time.time()
-            response_time = dict(nxapi_start = nxapi_start,
+    try:
+        for endpoint, parser in n9k_mo_dict.items():
+            nxapi_start = time.time()
+            mo = mo_name_dict[endpoint]
+            if 'aaaLogin' in endpoint:
+                auth_cookie = None
+                if token_ttl > 0:
+                    auth_cookie = load_auth_cookie(switch_ip, switchuser)
+                if auth_cookie is not None:
+                    logger.info('Reusing cached token for %s', switch_ip)
+                    cached_cookie = True
+                    keep_token = True
+                else:
+                    logger.info('Sending login request to %s', switch_ip)
+                    auth_cookie = aaa_login(session, switchuser,
+                                            switchpassword, switch_ip,
+                                            verify_ssl, timeout)
+                    if auth_cookie is None:
+                        logger.error('Unsuccessful auth from %s', switch_ip)
+                        return
+                    logger.info('Successful auth from %s', switch_ip)
+                    if token_ttl > 0:
+                        keep_token = store_auth_cookie(switch_ip, switchuser,
+                                                       auth_cookie)
+                nxapi_rsp = time.time()
+                nxapi_parse = time.time()
+                response_time = dict(nxapi_start = nxapi_start,
                                  nxapi_rsp = nxapi_rsp,
                                  nxapi_parse = nxapi_parse)
-            response_time_dict[switch_ip].insert(idx, response_time)
-            idx = idx + 1
-            # In n9k_mo_dict, all DME MOs are listed first and aaaLogout is the
-            # last. After this, start SSH/NXAPI calls of show commands
-            # order of DME and SSH/NXAPI calls must not be changed or mixed
-            nxapi_ep = True
-            continue
-
-        logger.info('Run %s on %s', mo, switch_ip)
-
-        if nxapi_ep:
-            imdata_list = nxapi_connect(switch_ip, switchuser, switchpassword, \
-                                        endpoint, verify_ssl, timeout)
-        else:
-            imdata_list = dme_connect(switch_ip, auth_cookie, endpoint, \
-                                      payload, verify_ssl, timeout)
-
-        nxapi_rsp = time.time()
-
-        if imdata_list:
-            logger.info('Received. Now parse stats for %s for %s', switch_ip, mo)
+                response_time_dict[switch_ip].append(response_time)
+                # Request all DME MOs now. Their responses are parsed one by
+                # one in the order of n9k_mo_dict below because parsers share
+                # stats_dict of this switch
+                dme_endpoints = [ep for ep in n9k_mo_dict \
+                                 if ep.startswith('/api/') \
+                                 and 'aaaLogin' not in ep \
+                                 and 'aaaLogout' not in ep]
+                dme_results = dme_connect_all(session, switch_ip, auth_cookie,
+                                              dme_endpoints, verify_ssl,
+                                              timeout)
+                # Only MOs rejected for auth are requested again. Others,
+                # like a timeout, stay failed for this poll
+                failed = [ep for ep in dme_endpoints if dme_results[ep][3]]
+                if failed and cached_cookie:
+                    # The switch may have expired the cached token before its
+                    # ttl. Logout the old token in case it is still alive,
+                    # login again once and retry
+                    logger.warning('Cached token rejected by %s. Login ' \
+                                   'again', switch_ip)
+                    aaa_logout(session, switchuser, switch_ip, auth_cookie,
+                               verify_ssl, timeout)
+                    # The next run must not load the rejected token again
+                    keep_token = False
+                    try:
+                        os.remove(get_token_file(switch_ip))
+                    except OSError:
+                        pass
+                    auth_cookie = aaa_login(session, switchuser,
+                                            switchpassword, switch_ip,
+                                            verify_ssl, timeout)
+                    if auth_cookie is None:
+                        logger.error('Unsuccessful auth from %s', switch_ip)
+                        return
+                    keep_token = store_auth_cookie(switch_ip, switchuser,
+                                                   auth_cookie)
+                    dme_results.update(dme_connect_all(session, switch_ip,
+                                                       auth_cookie, failed,
+                                                       verify_ssl, timeout))
+                continue
+            if 'aaaLogout' in endpoint:
+                if keep_token:
+                    # Keep the token alive for the next run
+                    logger.info('Skipping logout from %s to reuse token',
+                                switch_ip)
+                else:
+                    logger.info('Sending logout request to %s', switch_ip)
+                    aaa_logout(session, switchuser, switch_ip, auth_cookie,
+                               verify_ssl, timeout)
+                # Only ssh commands after this
+                session.close()
+                nxapi_rsp = time.time()
+                nxapi_parse = time.time()
+                response_time = dict(nxapi_start = nxapi_start,
+                                     nxapi_rsp = nxapi_rsp,
+                                     nxapi_parse = nxapi_parse)
+                response_time_dict[switch_ip].append(response_time)
+                # In n9k_mo_dict, all DME MOs are listed first and aaaLogout
+                # is the last. After this, start SSH/NXAPI calls of show
+                # commands. Order of DME and SSH/NXAPI calls must not be
+                # changed or mixed
+                nxapi_ep = True
+                continue
 
-            parser(imdata_list, stats_dict[switch_ip], mo)
+            if nxapi_ep:
+                logger.info('Run %s on %s', mo, switch_ip)
+                imdata_list = nxapi_connect(switch_ip, switchuser, \
+                                            switchpassword, endpoint, \
+                                            verify_ssl, timeout)
+                nxapi_rsp = time.time()
+            else:
+                nxapi_start, nxapi_rsp, imdata_list, _ = dme_results[endpoint]
+
+            if imdata_list:
+                logger.info('Received. Now parse stats for %s for %s',
+                            switch_ip, mo)
+
+                parse_start = time.time()
+                parser(imdata_list, stats_dict[switch_ip], mo)
+
+                logger.info('Done parsing stats for %s for %s', switch_ip, mo)
+                # DME responses are received together before any is parsed.
+                # Count only the time of this parser
+                nxapi_parse = nxapi_rsp + (time.time() - parse_start)
+                response_time = dict(nxapi_start = nxapi_start,
+                                     nxapi_rsp = nxapi_rsp,
+                                     nxapi_parse = nxapi_parse)
+                response_time_dict[switch_ip].append(response_time)
+    finally:
+        session.close()
 
-            logger.info('Done parsing stats for %s for %s', switch_ip, mo)
-            nxapi_parse = time.time()
-            response_time = dict(nxapi_start = nxapi_start,
-                                 nxapi_rsp = nxapi_rsp,
-                                 nxapi_parse = nxapi_parse)
-            response_time_dict[switch_ip].insert(idx, response_time)
-        idx = idx + 1
+def pull_stats_from_switch(switch_ip):
+    """
+    Run connect_and_pull_stats for one switch in a worker thread. An exception
+    from one switch must not stop the others
+    """
+    try:
+        connect_and_pull_stats(switch_ip)
+    except Exception as excp:
+        logger.exception('Exception: %s', excp)
 
 def get_switch_stats():
     """
@@ -1620,11 +1731,18 @@ def get_switch_stats():
 #    if nxapi_cmd:
 #        n9k_mo_dict['show clock'] = parse_nothing
 
-    for switch_ip in switch_dict:
-        try:
-            connect_and_pull_stats(switch_ip)
-        except Exception as excp:
-            logger.exception('Exception: %s', excp)
+    # endpoint's format: /api/mo/sys/sysmgrShowVersion.json
+    for endpoint in n9k_mo_dict:
+        mo_name_dict[endpoint] = endpoint.split('/')[-1].split('.')[0]
+
+    # Switches are independent of each other and most of the time is spent
+    # waiting for their responses. Pull them in parallel so that the total
+    # time is close to that of the slowest switch instead of the sum of all.
+    # Each thread only updates the entries of its own switch_ip in
+    # stats_dict and response_time_dict
+    max_workers = min(user_args['max_workers'], len(switch_dict))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(pull_stats_from_switch, switch_dict))
 
 ###############################################################################
 # END: Connection and Collector functions
@@ -1688,45 +1806,46 @@ def main(argv):
     # Final tasks
 
     # Print response time - total and per command set
-    time_output = ''
-    idx = 0
+    # Pieces of the report, joined once at the end
+    time_output = []
+    mo_names = list(mo_name_dict.values())
     for switch_ip, rsp_list in response_time_dict.items():
-        time_output = time_output + '\n' \
+        time_output.append('\n' \
             '    +------------------------------------------------------------------------+\n' \
             '    | Response time from - {:<15}                                   |\n' \
             '    |------------------------------------------------------------------------|'. \
-            format(switch_ip)
-        while idx < len(rsp_list):
-            if rsp_list[idx]['nxapi_rsp'] > rsp_list[idx]['nxapi_start']:
-                nxapi_rsp_time = str(round((rsp_list[idx]['nxapi_rsp'] - \
-                                              rsp_list[idx]['nxapi_start']), 2))
+            format(switch_ip))
+        for idx, rsp in enumerate(rsp_list):
+            if rsp['nxapi_rsp'] > rsp['nxapi_start']:
+                nxapi_rsp_time = str(round((rsp['nxapi_rsp'] - \
+                                              rsp['nxapi_start']), 2))
             else:
                 nxapi_rsp_time = 'N/A'
 
-            if rsp_list[idx]['nxapi_parse'] > rsp_list[idx]['nxapi_rsp']:
-                parse_time = str(round((rsp_list[idx]['nxapi_parse'] - \
-                                              rsp_list[idx]['nxapi_rsp']), 2))
+            if rsp['nxapi_parse'] > rsp['nxapi_rsp']:
+                parse_time = str(round((rsp['nxapi_parse'] - \
+                                              rsp['nxapi_rsp']), 2))
             else:
                 parse_time = 'N/A'
 
-            if rsp_list[idx]['nxapi_parse'] > rsp_list[idx]['nxapi_start']:
-                total_time = str(round((rsp_list[idx]['nxapi_parse'] - \
-                                              rsp_list[idx]['nxapi_start']), 2))
+            if rsp['nxapi_parse'] > rsp['nxapi_start']:
+                total_time = str(round((rsp['nxapi_parse'] - \
+                                              rsp['nxapi_start']), 2))
             else:
                 total_time = 'N/A'
 
-            time_output = time_output + '\n' + \
-                    '    | Command set:{0: <2}'.format(idx + 1)
+            time_output.append('\n' + \
+                    '    | Command set:{0: <2}'.format(idx + 1))
 
-            cmd_str = (list(n9k_mo_dict)[idx]).split('/')[-1].split('.')[0]
+            cmd_str = mo_names[idx]
 
             ml_cmd_str = ' : {0: <54}|'.format(' ')
             if len(cmd_str.split(',')) > 1:
                 for c in cmd_str.split(','):
                     ml_cmd_str = ml_cmd_str + '\n    |      {0: <66}|'.format(c.strip())
-                time_output = time_output + ml_cmd_str
+                time_output.append(ml_cmd_str)
             else:
-                time_output = time_output + ' : {0: <54}|'.format(cmd_str)
+                time_output.append(' : {0: <54}|'.format(cmd_str))
             '''
             time_output = time_output + '\n' + \
                     '    | Command set:{0:<2}  {0: <30}|'.\
@@ -1735,15 +1854,13 @@ def main(argv):
 
             #time_output = time_output + cmd_str
 
-            time_output = time_output + '\n' + \
+            time_output.append('\n' + \
             '    |------------------------------------------------------------------------|\n'\
             '    | NXAPI Response:{:>8} s | Parsing:{:>8} s                         |\n'\
             '    |------------------------------------------------------------------------|'.\
-            format(nxapi_rsp_time, parse_time)
-
-            idx = idx + 1
+            format(nxapi_rsp_time, parse_time))
 
-    time_output = time_output + '\n' \
+    time_output.append('\n' \
                    '    |------------------------------------------------------------------------|\n'\
                    '    | Time taken to complete                                                 |\n'\
                    '    |------------------------------------------------------------------------|\n'\
@@ -1756,10 +1873,10 @@ def main(argv):
                    format((input_read_time - start_time),
                           (connect_time - input_read_time),
                           (output_time - connect_time),
-                          (output_time - start_time))
+                          (output_time - start_time)))
 
     logger.setLevel(logging.INFO)
-    logger.info('%s', time_output)
+    logger.info('%s', ''.join(time_output))
     # DONE: Print response time - total and per command set
 
     logger.warning('---------- END ----------')